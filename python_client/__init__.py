@@ -1,5 +1,5 @@
 """Simple wrapper for querying the Stockfish CLI service via Docker."""
 
-from .client import StockfishDockerClient, Evaluation, Prediction  # noqa: F401
+from .client import EnginePool, StockfishDockerClient, StockfishTCPClient, Evaluation, PositionSpec, Prediction  # noqa: F401
 
-__all__ = ["StockfishDockerClient", "Prediction", "Evaluation"]
+__all__ = ["StockfishDockerClient", "StockfishTCPClient", "Prediction", "Evaluation", "PositionSpec", "EnginePool"]
@@ -3,9 +3,57 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import contextlib
 import dataclasses
+import http.client
+import json
+import operator
+import os
+import queue
+import select
+import signal
+import socket
 import subprocess
-from typing import Optional, Sequence
+import sys
+import threading
+import time
+import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Iterable, Iterator, NoReturn, Optional, Sequence
+from urllib.parse import quote
+
+DOCKER_SOCKET = "/var/run/docker.sock"
+
+# Port the container's socat listener publishes Stockfish on (see docker-compose.yml).
+DEFAULT_TCP_PORT = 3333
+
+# Port of the framed-protocol proxy service (python_client/uci_proxy.py).
+# Keep in sync with the proxy's --port default and docker-compose.yml.
+DEFAULT_PROXY_PORT = 3334
+
+# Longest accepted ``$<len>\r\n`` frame header; keep in sync with
+# ``uci_proxy.MAX_HEADER``.
+MAX_FRAME_HEADER = 24
+
+# Waits for closed engines to exit so callers never block on process teardown.
+_REAPER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stockfish-reaper")
+
+# Frames skipped when attributing warnings to the caller.
+_INTERNAL_FILES = frozenset({__file__, contextlib.__file__})
+
+# ``(fen, moves, depth)`` entry accepted by the batch APIs.
+PositionSpec = tuple[str, Optional[Sequence[str]], int]
+
+# Upper bound on command bytes written ahead of reading results; kept well
+# below the usual 64 KiB pipe capacity.
+PIPELINE_WINDOW = 16 * 1024
+
+# Trailing bytes of an engine's stderr kept for error messages.
+STDERR_TAIL = 8 * 1024
+
+# UCI commands sent to every new engine, each with the reply that completes it.
+_HANDSHAKE = (("uci", b"uciok"), ("isready", b"readyok"))
 
 
 @dataclasses.dataclass(frozen=True)
@@ -26,19 +74,130 @@ class Prediction:
     evaluation: Evaluation
 
 
-class StockfishDockerClient:
-    """Run Stockfish inside ``docker exec`` and surface predictions."""
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection to the Docker Engine API over its Unix socket."""
 
-    def __init__(
-        self,
-        container_name: str = "stockfish-engine",
-        engine_cmd: str = "stockfish",
-    ) -> None:
+    def __init__(self, socket_path: str, timeout: float) -> None:
+        super().__init__("docker", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class _ReadyState:
+    """Cached running state of one container, shared by all clients that use it."""
+
+    def __init__(self, container_name: str, docker_socket: str) -> None:
         self.container_name = container_name
-        self.engine_cmd = engine_cmd
+        self.docker_socket = docker_socket
+        self.cached: Optional[tuple[float, bool]] = None
+        # One interval per subscribed client; the refresher runs at the shortest.
+        self._intervals: list[float] = []
+        self._refresher: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
 
-    def is_service_ready(self) -> bool:
-        """Check if the Docker container exists and is running."""
+    def lookup(self, ttl: float) -> Optional[bool]:
+        """Return the cached answer, or ``None`` when Docker must be asked.
+
+        While a refresher runs it replaces the answer itself, so it never expires.
+        """
+
+        cached = self.cached
+        if cached is None:
+            return None
+        if self._intervals or time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        return None
+
+    def probe(self) -> bool:
+        """Ask Docker whether the container is running, caching only a positive answer.
+
+        A container that is still starting must be seen as soon as it runs, so
+        "not running" is never reused.
+        """
+
+        try:
+            info = self._docker_get(f"/containers/{quote(self.container_name, safe='')}/json")
+        except (OSError, http.client.HTTPException, ValueError):
+            running = self._inspect_running()
+        else:
+            running = bool(info and info.get("State", {}).get("Running"))
+
+        self.cached = (time.monotonic(), True) if running else None
+        return running
+
+    def subscribe(self, interval: float) -> None:
+        """Keep the answer fresh by re-probing every ``interval`` seconds on a daemon thread.
+
+        All subscribers of a container share one thread, which follows the
+        shortest interval requested; it stops once every subscriber has left.
+        """
+
+        if not interval > 0:
+            raise ValueError("ready_refresh must be a positive number of seconds")
+
+        with self._lock:
+            if self._intervals and interval >= min(self._intervals):
+                self._intervals.append(interval)
+                return
+            self._intervals.append(interval)
+            if self._refresher is None:
+                self._wake.clear()
+                self._refresher = threading.Thread(
+                    target=self._refresh_loop,
+                    name=f"stockfish-ready-{self.container_name}",
+                    daemon=True,
+                )
+                self._refresher.start()
+            else:
+                # Apply the shorter interval now rather than after the current wait.
+                self._wake.set()
+
+    def unsubscribe(self, interval: float) -> None:
+        """Drop one subscription made with ``interval``."""
+
+        with self._lock:
+            self._intervals.remove(interval)
+            if not self._intervals:
+                self._wake.set()
+
+    def _refresh_loop(self) -> None:
+        while True:
+            with self._lock:
+                if not self._intervals:
+                    self._refresher = None
+                    return
+                interval = min(self._intervals)
+            self.probe()
+            self._wake.wait(interval)
+            self._wake.clear()
+
+    def _docker_get(self, path: str) -> Optional[dict[str, Any]]:
+        """GET ``path`` from the Docker Engine API; ``None`` for non-200 replies."""
+
+        connection = _UnixHTTPConnection(self.docker_socket, timeout=2.0)
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            body = response.read()
+        finally:
+            connection.close()
+
+        if response.status != 200:
+            return None
+        return json.loads(body)
+
+    def _inspect_running(self) -> bool:
+        """Ask the Docker CLI whether the container is running."""
 
         try:
             result = subprocess.run(
@@ -58,15 +217,724 @@ class StockfishDockerClient:
 
         return result.stdout.strip().lower() == "true"
 
+
+# Readiness shared by every client of a container, keyed by (container, socket).
+# Entries own refresher threads, so they are never evicted.
+_READY_STATES: dict[tuple[str, str], _ReadyState] = {}
+_READY_STATES_LOCK = threading.Lock()
+
+
+def _ready_state(container_name: str, docker_socket: str) -> _ReadyState:
+    with _READY_STATES_LOCK:
+        state = _READY_STATES.get((container_name, docker_socket))
+        if state is None:
+            state = _READY_STATES[container_name, docker_socket] = _ReadyState(container_name, docker_socket)
+        return state
+
+
+class _StderrTail:
+    """Drain an engine's stderr on a daemon thread, keeping only its last bytes.
+
+    A stderr pipe nobody reads fills up after about 64 KiB and then blocks the
+    engine mid-search. Pass :attr:`write_fd` as the child's stderr and call
+    :meth:`start` once the child has been spawned (or failed to spawn).
+    """
+
+    def __init__(self) -> None:
+        read_fd, self.write_fd = os.pipe()
+        self._stream = os.fdopen(read_fd, "rb", buffering=0)
+        self._data = bytearray()
+        self._thread = threading.Thread(target=self._drain, name="stockfish-stderr", daemon=True)
+
+    def start(self) -> None:
+        # The child holds its own copy; closing ours lets the reader see EOF.
+        os.close(self.write_fd)
+        self._thread.start()
+
+    def text(self, timeout: float = 5.0) -> str:
+        """Return the captured tail, waiting up to ``timeout`` seconds for EOF."""
+
+        self._thread.join(timeout)
+        return bytes(self._data).decode(errors="replace").strip()
+
+    def _drain(self) -> None:
+        with self._stream:
+            data = self._data
+            while True:
+                chunk = self._stream.read(65536)
+                if not chunk:
+                    return
+                data += chunk
+                if len(data) > STDERR_TAIL:
+                    del data[:-STDERR_TAIL]
+
+
+class _PositionCache:
+    """Remember the last ``position`` command built for a session.
+
+    A game stepped forward one ply at a time only appends the new moves to the
+    cached command instead of re-joining the whole move list. The caller's
+    moves are compared in place; only moves not seen before are copied.
+    """
+
+    def __init__(self) -> None:
+        self._fen: Optional[str] = None
+        self._moves: list[str] = []
+        self._command = ""
+
+    def command(self, fen: str, moves: Optional[Sequence[str]]) -> str:
+        moves = moves or ()
+        cached = self._moves
+        played = len(cached)
+        # ``map`` stops at the shorter sequence, so this checks the prefix.
+        if fen == self._fen and len(moves) >= played and all(map(operator.eq, moves, cached)):
+            if len(moves) == played:
+                return self._command
+            if played:
+                new_moves = moves[played:]
+                cached.extend(new_moves)
+                self._command = f"{self._command} {' '.join(new_moves)}"
+                return self._command
+
+        self._fen = fen
+        self._moves = list(moves)
+        self._command = _position_command(fen, self._moves)
+        return self._command
+
+
+class _GameTracker:
+    """Track which game an engine's hash tables currently belong to."""
+
+    # Key recorded for searches without a ``game_id``.
+    _UNTAGGED = object()
+
+    def __init__(self) -> None:
+        self._key: Optional[Hashable] = None
+
+    def enter(self, game_id: Optional[Hashable], fen: str) -> bool:
+        """Record the game of the next search; ``True`` if ``ucinewgame`` is due.
+
+        Only an engine that has not searched yet has clean tables, so a tagged
+        game skips the reset just when it comes first. Untagged searches never
+        ask for one; they leave the caller in charge through ``new_game``.
+        """
+
+        if game_id is None:
+            self._key = self._UNTAGGED
+            return False
+        key = (game_id, fen)
+        previous = self._key
+        self._key = key
+        return previous is not None and previous != key
+
+
+class _SessionState:
+    """Protocol state of one engine session: its cached ``position`` command and game."""
+
+    def __init__(self) -> None:
+        self.positions = _PositionCache()
+        self.game = _GameTracker()
+
+    def windows(
+        self,
+        positions: Sequence[PositionSpec],
+        new_game: bool,
+        game_id: Optional[Hashable] = None,
+    ) -> Iterator[tuple[list[str], list[int]]]:
+        """Plan the pipelined writes for ``positions``, resetting the hash if the game changed."""
+
+        if self.game.enter(game_id, positions[0][0]):
+            new_game = True
+        return _command_windows(positions, new_game, self.positions.command)
+
+
+class _EngineHandle:
+    """One persistent UCI conversation with a Stockfish engine.
+
+    Subclasses provide the byte transport; this class speaks the protocol.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._session = _SessionState()
+
+    def is_alive(self) -> bool:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Ask the engine to quit and release the transport."""
+
+        raise NotImplementedError
+
+    def kill(self) -> None:
+        """Drop the transport without a ``quit`` handshake."""
+
+        raise NotImplementedError
+
+    def exit_error(self) -> Optional[str]:
+        """Describe an abnormal exit once the closed engine has been reaped."""
+
+        return None
+
+    def is_reaped(self) -> bool:
+        """Whether a closed engine is fully shut down, so :meth:`exit_error` is final."""
+
+        return True
+
+    def _write(self, data: bytes) -> None:
+        raise NotImplementedError
+
+    def _read_chunk(self) -> bytes:
+        raise NotImplementedError
+
+    def _raise_closed(self) -> NoReturn:
+        raise NotImplementedError
+
+    def _fileno(self) -> int:
+        raise NotImplementedError
+
+    def handshake(self) -> None:
+        for command, reply in _HANDSHAKE:
+            self.send([command])
+            self.read_until(reply)
+
+    def ping(self, timeout: float) -> bool:
+        """Return whether the engine answers ``isready`` within ``timeout`` seconds."""
+
+        if not self.is_alive():
+            return False
+
+        deadline = time.monotonic() + timeout
+        buffer = self._buffer
+        try:
+            self.send(["isready"])
+            while True:
+                index = buffer.find(b"\n")
+                if index >= 0:
+                    line = bytes(buffer[:index])
+                    del buffer[: index + 1]
+                    if line == b"readyok":
+                        return True
+                    continue
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([self._fileno()], [], [], remaining)[0]:
+                    return False
+                chunk = self._read_chunk()
+                if not chunk:
+                    return False
+                buffer += chunk
+        except OSError:
+            return False
+
+    def send(self, commands: Sequence[str]) -> None:
+        """Write all ``commands`` to the engine as a single buffer."""
+
+        self._write("".join(f"{command}\n" for command in commands).encode())
+
+    def read_line(self) -> Optional[bytes]:
+        """Return the next engine line without its newline, or ``None`` at EOF.
+
+        Output is read in large chunks into a persistent buffer and split with
+        ``bytearray.find``; bytes already scanned are not searched again.
+        """
+
+        buffer = self._buffer
+        scanned = 0
+        while True:
+            index = buffer.find(b"\n", scanned)
+            if index >= 0:
+                line = bytes(buffer[:index])
+                del buffer[: index + 1]
+                return line
+            scanned = len(buffer)
+            chunk = self._read_chunk()
+            if not chunk:
+                return None
+            buffer += chunk
+
+    def read_until(self, token: bytes) -> bytes:
+        while True:
+            line = self.read_line()
+            if line is None:
+                self._raise_closed()
+            if line.startswith(token):
+                return line
+
+    def run_searches(
+        self,
+        positions: Sequence[PositionSpec],
+        new_game: bool,
+        game_id: Optional[Hashable] = None,
+    ) -> list[Prediction]:
+        """Pipeline one ``position``/``go`` pair per entry and collect the results in order."""
+
+        predictions: list[Prediction] = []
+        for commands, depths in self._session.windows(positions, new_game, game_id):
+            self.send(commands)
+            predictions.extend(self.read_prediction(depth) for depth in depths)
+        return predictions
+
+    def read_prediction(self, depth: int) -> Prediction:
+        """Consume engine output up to and including the next ``bestmove`` line."""
+
+        prediction = _collect_prediction(iter(self.read_line, None), depth)
+        if prediction is None:
+            self._raise_closed()
+        return prediction
+
+
+class _ProcessEngine(_EngineHandle):
+    """Engine reached through the stdin/stdout pipes of a local command."""
+
+    def __init__(self, argv: Sequence[str]) -> None:
+        super().__init__()
+        self._stderr = _StderrTail()
+        try:
+            self._process = subprocess.Popen(
+                argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=self._stderr.write_fd,
+                bufsize=0,
+            )
+        except FileNotFoundError as exc:
+            raise RuntimeError(f"{argv[0]} is not installed or not found in PATH") from exc
+        finally:
+            self._stderr.start()
+
+        self._reaped: Optional[Future[Optional[str]]] = None
+        if self._process.stdin is None or self._process.stdout is None:
+            self.kill()
+            raise RuntimeError("Failed to open Stockfish stdin/stdout streams")
+        self._stdin_fd = self._process.stdin.fileno()
+        self._stdout_fd = self._process.stdout.fileno()
+
+    def is_alive(self) -> bool:
+        return self._reaped is None and self._process.poll() is None
+
+    def close(self) -> None:
+        """Send ``quit`` and leave waiting for the exit to the background reaper."""
+
+        if self._reaped is not None:
+            return
+        process = self._process
+        if process.poll() is None and process.stdin is not None:
+            try:
+                process.stdin.write(b"quit\n")
+            except OSError:
+                pass
+        self._reaped = _REAPER.submit(_drain_and_wait, process, self._stderr, False)
+
+    def kill(self) -> None:
+        if self._reaped is not None:
+            return
+        killed = self._process.poll() is None
+        if killed:
+            self._process.kill()
+        self._reaped = _REAPER.submit(_drain_and_wait, self._process, self._stderr, killed)
+
+    def exit_error(self) -> Optional[str]:
+        if self._reaped is None or not self._reaped.done():
+            return None
+        return self._reaped.result()
+
+    def is_reaped(self) -> bool:
+        return self._reaped is not None and self._reaped.done()
+
+    def _write(self, data: bytes) -> None:
+        # One os.write per batch; loop only on the rare partial pipe write.
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._stdin_fd, view) :]
+
+    def _read_chunk(self) -> bytes:
+        return os.read(self._stdout_fd, 65536)
+
+    def _fileno(self) -> int:
+        return self._stdout_fd
+
+    def _raise_closed(self) -> NoReturn:
+        """Raise with whatever the engine wrote to stderr after stdout closed."""
+
+        process = self._process
+        try:
+            process.communicate(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+        # Already reaped here, and the failure is reported by the exception.
+        self._reaped = Future()
+        self._reaped.set_result(None)
+        raise RuntimeError(f"Stockfish process failed: {self._stderr.text()}")
+
+
+class _SocketEngine(_EngineHandle):
+    """Engine reached over a TCP connection, one engine per connection."""
+
+    def __init__(self, host: str, port: int, connect_timeout: float = 5.0) -> None:
+        super().__init__()
+        self.address = (host, port)
+        try:
+            self._sock: Optional[socket.socket] = socket.create_connection(self.address, timeout=connect_timeout)
+        except OSError as exc:
+            raise RuntimeError(f"Could not connect to Stockfish at {host}:{port}: {exc}") from exc
+        # Searches can take arbitrarily long; only the connect is bounded.
+        self._sock.settimeout(None)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def is_alive(self) -> bool:
+        return self._sock is not None
+
+    def close(self) -> None:
+        if self._sock is None:
+            return
+        try:
+            self._sock.sendall(b"quit\n")
+        except OSError:
+            pass
+        self.kill()
+
+    def kill(self) -> None:
+        sock = self._sock
+        self._sock = None
+        if sock is not None:
+            sock.close()
+
+    def _write(self, data: bytes) -> None:
+        if self._sock is None:
+            self._raise_closed()
+        self._sock.sendall(data)
+
+    def _read_chunk(self) -> bytes:
+        if self._sock is None:
+            return b""
+        return self._sock.recv(65536)
+
+    def _fileno(self) -> int:
+        if self._sock is None:
+            raise OSError("Stockfish connection is closed")
+        return self._sock.fileno()
+
+    def _raise_closed(self) -> NoReturn:
+        host, port = self.address
+        self.kill()
+        raise RuntimeError(f"Stockfish connection to {host}:{port} was closed")
+
+
+class _FramedEngine(_SocketEngine):
+    """Engine behind the in-container UCI proxy, exchanging length-prefixed frames.
+
+    Each request frame holds the commands for one search and its reply holds
+    all output up to ``bestmove``, so replies are read by length rather than
+    scanned line by line.
+    """
+
+    def close(self) -> None:
+        # Hanging up is the protocol's quit: the proxy stops the engine on EOF.
+        self.kill()
+
+    def handshake(self) -> None:
+        self.send([command for command, _ in _HANDSHAKE])
+        self._read_frame()
+
+    def ping(self, timeout: float) -> bool:
+        if not self.is_alive():
+            return False
+        try:
+            self.send(["isready"])
+            return self._read_frame(time.monotonic() + timeout) is not None
+        except (OSError, RuntimeError):
+            return False
+
+    def send(self, commands: Sequence[str]) -> None:
+        self._write(_encode_frame("\n".join(commands).encode()))
+
+    def run_searches(
+        self,
+        positions: Sequence[PositionSpec],
+        new_game: bool,
+        game_id: Optional[Hashable] = None,
+    ) -> list[Prediction]:
+        predictions: list[Prediction] = []
+        for commands, depths in self._session.windows(positions, new_game, game_id):
+            frames = bytearray()
+            start = 0
+            for index, command in enumerate(commands):
+                if command.startswith("go "):
+                    frames += _encode_frame("\n".join(commands[start : index + 1]).encode())
+                    start = index + 1
+            self._write(frames)
+            predictions.extend(self.read_prediction(depth) for depth in depths)
+        return predictions
+
+    def read_prediction(self, depth: int) -> Prediction:
+        payload = self._read_frame()
+        assert payload is not None
+        prediction = _collect_prediction(payload.split(b"\n"), depth)
+        if prediction is None:
+            raise RuntimeError("Stockfish proxy reply did not contain a best move")
+        return prediction
+
+    def _read_frame(self, deadline: Optional[float] = None) -> Optional[bytes]:
+        """Return the next reply payload; ``None`` if ``deadline`` passes first."""
+
+        buffer = self._buffer
+        while True:
+            end = buffer.find(b"\r\n", 0, MAX_FRAME_HEADER)
+            if end >= 0:
+                break
+            if len(buffer) >= MAX_FRAME_HEADER:
+                raise RuntimeError("Malformed frame header from Stockfish proxy")
+            if not self._fill(deadline):
+                return None
+
+        try:
+            size = int(buffer[1:end])
+        except ValueError:
+            size = -1
+        if buffer[:1] != b"$" or size < 0:
+            raise RuntimeError("Malformed frame header from Stockfish proxy")
+        start = end + 2
+        stop = start + size
+        while len(buffer) < stop + 2:
+            if not self._fill(deadline):
+                return None
+
+        payload = bytes(buffer[start:stop])
+        del buffer[: stop + 2]
+        return payload
+
+    def _fill(self, deadline: Optional[float]) -> bool:
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self._fileno()], [], [], remaining)[0]:
+                return False
+        chunk = self._read_chunk()
+        if not chunk:
+            self._raise_closed()
+        self._buffer += chunk
+        return True
+
+
+class _RetiredEngines:
+    """Stopped engines whose exit status has not been checked yet."""
+
+    def __init__(self) -> None:
+        self._engines: list[_EngineHandle] = []
+        self._lock = threading.Lock()
+
+    def add(self, engine: _EngineHandle) -> None:
+        with self._lock:
+            self._engines.append(engine)
+
+    def report(self) -> None:
+        """Warn about reaped engines that exited abnormally and forget every reaped one."""
+
+        finished: list[_EngineHandle] = []
+        with self._lock:
+            running: list[_EngineHandle] = []
+            for engine in self._engines:
+                (finished if engine.is_reaped() else running).append(engine)
+            self._engines = running
+
+        for engine in finished:
+            message = engine.exit_error()
+            if message is not None:
+                _warn_engine_exit(message)
+
+
+class EnginePool:
+    """Bounded pool of persistent, pre-handshaken Stockfish engines.
+
+    Engines are started lazily up to ``max_size`` and handed out one caller at a
+    time through :meth:`acquire`. An idle engine must answer ``isready`` within
+    ``health_timeout`` seconds before it is reused; otherwise it is killed and
+    replaced.
+    """
+
+    # Queued by :meth:`close` to wake callers blocked in :meth:`acquire`.
+    _CLOSED = object()
+
+    def __init__(
+        self,
+        factory: Callable[[], _EngineHandle],
+        max_size: int = 4,
+        health_timeout: float = 2.0,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self._factory = factory
+        self.max_size = max_size
+        self.health_timeout = health_timeout
+        self._closed = False
+        self._retired = _RetiredEngines()
+        # ``None`` marks a free slot that may start a new engine; LIFO order
+        # hands out the most recently used (warmest) engine first.
+        self._idle: queue.LifoQueue[object] = queue.LifoQueue()
+        for _ in range(max_size):
+            self._idle.put(None)
+
+    @classmethod
+    def docker(
+        cls,
+        container_name: str = "stockfish-engine",
+        engine_cmd: str = "stockfish",
+        max_size: int = 4,
+        health_timeout: float = 2.0,
+    ) -> EnginePool:
+        """Pool whose engines are ``docker exec -i`` sessions."""
+
+        argv = ["docker", "exec", "-i", container_name, engine_cmd]
+        return cls(lambda: _ProcessEngine(argv), max_size, health_timeout)
+
+    @classmethod
+    def tcp(
+        cls,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_TCP_PORT,
+        max_size: int = 4,
+        health_timeout: float = 2.0,
+        framed: bool = False,
+    ) -> EnginePool:
+        """Pool whose engines are connections to the container's TCP port.
+
+        Set ``framed`` when ``port`` is the framed-protocol proxy.
+        """
+
+        engine_class = _FramedEngine if framed else _SocketEngine
+        return cls(lambda: engine_class(host, port), max_size, health_timeout)
+
+    def __enter__(self) -> EnginePool:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @contextlib.contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[_EngineHandle]:
+        """Check an engine out for the duration of the ``with`` block.
+
+        Blocks up to ``timeout`` seconds (forever when ``None``) while every
+        engine is busy. An engine whose block raises is discarded, since its
+        output may be half read.
+        """
+
+        engine = self._checkout(timeout)
+        try:
+            yield engine
+        except BaseException:
+            self._discard(engine)
+            raise
+        self.release(engine)
+
+    def release(self, engine: _EngineHandle) -> None:
+        """Return a healthy engine to the pool."""
+
+        if self._closed:
+            engine.close()
+            return
+        self._idle.put(engine)
+
+    def close(self) -> None:
+        """Quit every idle engine; engines still checked out are closed on release.
+
+        Callers blocked in :meth:`acquire` are woken and get ``RuntimeError``.
+        """
+
+        self._closed = True
+        while True:
+            try:
+                engine = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(engine, _EngineHandle):
+                engine.close()
+        # Each woken caller puts the marker back for the next one.
+        self._idle.put(self._CLOSED)
+
+    def _checkout(self, timeout: Optional[float]) -> _EngineHandle:
+        if self._closed:
+            raise RuntimeError("Engine pool is closed")
+        self._retired.report()
+
+        try:
+            engine = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("No Stockfish engine became available") from None
+
+        if self._closed:
+            if engine is self._CLOSED:
+                self._idle.put(engine)
+            elif isinstance(engine, _EngineHandle):
+                engine.close()
+            raise RuntimeError("Engine pool is closed")
+
+        if isinstance(engine, _EngineHandle):
+            if engine.ping(self.health_timeout):
+                return engine
+            engine.kill()
+            self._retired.add(engine)
+
+        try:
+            engine = self._factory()
+            engine.handshake()
+        except BaseException:
+            self._idle.put(None)
+            raise
+        return engine
+
+    def _discard(self, engine: _EngineHandle) -> None:
+        engine.kill()
+        self._retired.add(engine)
+        self._idle.put(None)
+
+
+class _UCIClient:
+    """Prediction API on top of one lazily opened engine.
+
+    With a ``pool`` every query checks an engine out of it instead, so one
+    client can be shared by concurrent threads. The ``a``-prefixed coroutines
+    run the same queries on a worker thread, through the same transport.
+    """
+
+    def __init__(self, pool: Optional[EnginePool] = None) -> None:
+        self.pool = pool
+        self._engine: Optional[_EngineHandle] = None
+        self._retired = _RetiredEngines()
+        # Serialises use of the single engine, e.g. by coroutines' worker threads.
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> _UCIClient:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    async def __aenter__(self) -> _UCIClient:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
     def predict_next_move(
         self,
         fen: str = "startpos",
         depth: int = 12,
         moves: Optional[Sequence[str]] = None,
+        new_game: bool = False,
+        game_id: Optional[Hashable] = None,
     ) -> Prediction:
-        """Ask Stockfish for the next best move and evaluation."""
+        """Ask Stockfish for the next best move and evaluation.
+
+        Pass ``new_game=True`` to clear the engine's hash tables before searching.
+        Alternatively tag queries with a ``game_id``: the hash is then cleared
+        only when the id (or the starting ``fen``) differs from the previous
+        query's.
+        """
 
-        prediction = self._query_engine(fen, depth, moves)
+        prediction = self._query_engine(fen, depth, moves, new_game, game_id)
         return prediction
 
     def analyze_position(
@@ -74,134 +942,619 @@ class StockfishDockerClient:
         fen: str = "startpos",
         depth: int = 12,
         moves: Optional[Sequence[str]] = None,
+        new_game: bool = False,
+        game_id: Optional[Hashable] = None,
     ) -> Evaluation:
         """Return the latest evaluation for the position."""
 
-        return self._query_engine(fen, depth, moves).evaluation
+        return self._query_engine(fen, depth, moves, new_game, game_id).evaluation
+
+    def predict_batch(
+        self,
+        positions: Sequence[PositionSpec],
+        new_game: bool = False,
+        game_id: Optional[Hashable] = None,
+    ) -> list[Prediction]:
+        """Predict the best move for each ``(fen, moves, depth)`` entry.
+
+        Searches are pipelined in windows of up to ``PIPELINE_WINDOW`` bytes of
+        commands: each window is written at once and its results are read back,
+        split on ``bestmove`` lines, before the next is sent. Most batches fit
+        in a single window and so cost one round-trip.
+        """
+
+        if not positions:
+            return []
+        return self._run_searches(positions, new_game, game_id)
+
+    def analyze_batch(
+        self,
+        positions: Sequence[PositionSpec],
+        new_game: bool = False,
+        game_id: Optional[Hashable] = None,
+    ) -> list[Evaluation]:
+        """Return the evaluation for each ``(fen, moves, depth)`` entry."""
+
+        return [prediction.evaluation for prediction in self.predict_batch(positions, new_game, game_id)]
+
+    async def apredict_next_move(
+        self,
+        fen: str = "startpos",
+        depth: int = 12,
+        moves: Optional[Sequence[str]] = None,
+        new_game: bool = False,
+        game_id: Optional[Hashable] = None,
+    ) -> Prediction:
+        """Async variant of :meth:`predict_next_move`."""
+
+        return (await self._arun_searches([(fen, moves, depth)], new_game, game_id))[0]
+
+    async def aanalyze_position(
+        self,
+        fen: str = "startpos",
+        depth: int = 12,
+        moves: Optional[Sequence[str]] = None,
+        new_game: bool = False,
+        game_id: Optional[Hashable] = None,
+    ) -> Evaluation:
+        """Async variant of :meth:`analyze_position`."""
+
+        return (await self.apredict_next_move(fen, depth, moves, new_game, game_id)).evaluation
+
+    async def apredict_batch(
+        self,
+        positions: Sequence[PositionSpec],
+        new_game: bool = False,
+        game_id: Optional[Hashable] = None,
+    ) -> list[Prediction]:
+        """Async variant of :meth:`predict_batch`."""
+
+        if not positions:
+            return []
+        return await self._arun_searches(positions, new_game, game_id)
+
+    async def aanalyze_batch(
+        self,
+        positions: Sequence[PositionSpec],
+        new_game: bool = False,
+        game_id: Optional[Hashable] = None,
+    ) -> list[Evaluation]:
+        """Async variant of :meth:`analyze_batch`."""
+
+        return [prediction.evaluation for prediction in await self.apredict_batch(positions, new_game, game_id)]
+
+    async def aclose(self) -> None:
+        """Async variant of :meth:`close`."""
+
+        self.close()
+
+    def close(self) -> None:
+        """Send ``quit`` to the engine and release its connection."""
+
+        self._close_engine()
+
+    def _close_engine(self) -> None:
+        """Quit the engine only; subclasses extend :meth:`close` with more teardown."""
+
+        engine = self._engine
+        self._engine = None
+        if engine is not None:
+            engine.close()
+            self._retired.add(engine)
+
+    def _open_engine(self) -> _EngineHandle:
+        raise NotImplementedError
+
+    def _ensure_engine(self) -> _EngineHandle:
+        """Return the running engine, starting it and doing the UCI handshake if needed."""
+
+        self._retired.report()
+
+        if self._engine is not None:
+            if self._engine.is_alive():
+                return self._engine
+            self._close_engine()
+
+        engine = self._open_engine()
+        try:
+            engine.handshake()
+        except BaseException:
+            engine.kill()
+            raise
+
+        self._engine = engine
+        return engine
+
+    def _discard_engine(self) -> None:
+        """Kill the engine after a failed exchange so the next query starts afresh."""
+
+        engine = self._engine
+        self._engine = None
+        if engine is not None:
+            engine.kill()
 
     def _query_engine(
         self,
         fen: str,
         depth: int,
         moves: Optional[Sequence[str]],
+        new_game: bool = False,
+        game_id: Optional[Hashable] = None,
     ) -> Prediction:
-        commands: list[str] = ["uci", "isready", "ucinewgame"]
-        moves_payload = list(moves) if moves else None
+        return self._run_searches([(fen, moves, depth)], new_game, game_id)[0]
 
-        if moves_payload:
-            if fen == "startpos":
-                commands.append(f"position startpos moves {' '.join(moves_payload)}")
-            else:
-                commands.append(f"position fen {fen} moves {' '.join(moves_payload)}")
-        elif fen == "startpos":
-            commands.append("position startpos")
-        else:
-            commands.append(f"position fen {fen}")
+    def _run_searches(
+        self,
+        positions: Sequence[PositionSpec],
+        new_game: bool,
+        game_id: Optional[Hashable] = None,
+    ) -> list[Prediction]:
+        if self.pool is not None:
+            with self.pool.acquire() as pooled:
+                return pooled.run_searches(positions, new_game, game_id)
 
-        commands.append(f"go depth {depth}")
+        with self._lock:
+            engine = self._ensure_engine()
+            try:
+                return engine.run_searches(positions, new_game, game_id)
+            except BaseException:
+                self._discard_engine()
+                raise
+
+    async def _arun_searches(
+        self,
+        positions: Sequence[PositionSpec],
+        new_game: bool,
+        game_id: Optional[Hashable] = None,
+    ) -> list[Prediction]:
+        return await asyncio.to_thread(self._run_searches, positions, new_game, game_id)
+
+
+class StockfishTCPClient(_UCIClient):
+    """Talk UCI to a Stockfish engine listening on a TCP port.
+
+    The bundled container runs ``socat`` so that every connection gets its own
+    engine; one connection is opened lazily and reused for every query. With
+    ``framed=True`` the client instead speaks the length-prefixed protocol of
+    the ``stockfish-proxy`` service (``DEFAULT_PROXY_PORT``).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_TCP_PORT,
+        pool: Optional[EnginePool] = None,
+        framed: bool = False,
+    ) -> None:
+        super().__init__(pool)
+        self.host = host
+        self.port = port
+        self.framed = framed
+
+    def __enter__(self) -> StockfishTCPClient:
+        return self
+
+    async def __aenter__(self) -> StockfishTCPClient:
+        return self
+
+    def _open_engine(self) -> _EngineHandle:
+        if self.framed:
+            return _FramedEngine(self.host, self.port)
+        return _SocketEngine(self.host, self.port)
+
+
+class StockfishDockerClient(_UCIClient):
+    """Run Stockfish inside ``docker exec`` and surface predictions.
+
+    A single ``docker exec -i`` session is opened lazily on the first query and
+    reused for every later call; use :meth:`close` (or the client as a context
+    manager) to shut the engine down. When ``port`` is given the engine is
+    reached through the container's published TCP port instead, exactly as
+    :class:`StockfishTCPClient` does, and ``docker exec`` is not used.
+
+    Without ``port`` or ``pool`` the ``a``-prefixed coroutines drive a
+    separate ``docker exec`` session through asyncio subprocess streams, bound
+    to the event loop that first uses them; release it with :meth:`aclose` (or
+    ``async with``). Otherwise they go through the configured transport.
+    """
+
+    def __init__(
+        self,
+        container_name: str = "stockfish-engine",
+        engine_cmd: str = "stockfish",
+        docker_socket: str = DOCKER_SOCKET,
+        ready_ttl: float = 5.0,
+        host: str = "127.0.0.1",
+        port: Optional[int] = None,
+        pool: Optional[EnginePool] = None,
+        ready_refresh: Optional[float] = None,
+    ) -> None:
+        super().__init__(pool)
+        self.container_name = container_name
+        self.engine_cmd = engine_cmd
+        self.docker_socket = docker_socket
+        self.ready_ttl = ready_ttl
+        self.host = host
+        self.port = port
+        self._ready = _ready_state(container_name, docker_socket)
+        self._ready_refresh: Optional[float] = None
+        if ready_refresh is not None:
+            self._ready.subscribe(ready_refresh)
+            self._ready_refresh = ready_refresh
+        self._aproc: Optional[asyncio.subprocess.Process] = None
+        self._aloop: Optional[asyncio.AbstractEventLoop] = None
+        self._astderr: Optional[_StderrTail] = None
+        self._alock: Optional[asyncio.Lock] = None
+        self._asession = _SessionState()
+
+    def __enter__(self) -> StockfishDockerClient:
+        return self
+
+    async def __aenter__(self) -> StockfishDockerClient:
+        return self
+
+    def is_service_ready(self) -> bool:
+        """Check if the Docker container exists and is running.
+
+        Queries the Docker Engine API over ``docker_socket`` and falls back to
+        ``docker inspect`` when the socket is not accessible. A positive answer
+        is shared by all clients of the container and reused for ``ready_ttl``
+        seconds; with ``ready_refresh`` set, a background thread keeps it fresh.
+        """
+
+        cached = self._ready.lookup(self.ready_ttl)
+        if cached is not None:
+            return cached
+        return self._ready.probe()
+
+    def invalidate_ready_cache(self) -> None:
+        """Forget the cached readiness so the next check asks Docker again."""
+
+        self._ready.cached = None
+
+    def stop_ready_refresh(self) -> None:
+        """Withdraw this client's ``ready_refresh``; :meth:`close` does this too.
+
+        The background thread stops once no client of the container needs it.
+        """
 
-        stderr_output = ""
+        interval = self._ready_refresh
+        self._ready_refresh = None
+        if interval is not None:
+            self._ready.unsubscribe(interval)
+
+    def close(self) -> None:
+        self.stop_ready_refresh()
+        super().close()
+
+    def _open_engine(self) -> _EngineHandle:
+        if self.port is not None:
+            return _SocketEngine(self.host, self.port)
+        return _ProcessEngine(["docker", "exec", "-i", self.container_name, self.engine_cmd])
+
+    async def aclose(self) -> None:
+        """Quit the async engine session, wait for it to exit, then do what :meth:`close` does."""
+
+        process = self._aproc
+        if process is not None and self._aloop is not asyncio.get_running_loop():
+            self._adiscard_engine()
+        elif process is not None:
+            self._aproc = None
+            try:
+                if process.returncode is None and process.stdin is not None:
+                    process.stdin.write(b"quit\n")
+                    await process.stdin.drain()
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except (OSError, asyncio.TimeoutError):
+                process.kill()
+                await process.wait()
+
+        await super().aclose()
+
+    async def _aensure_engine(self) -> asyncio.subprocess.Process:
+        """Async counterpart of :meth:`_ensure_engine` for the running event loop."""
+
+        if self._aproc is not None:
+            if self._aproc.returncode is None:
+                return self._aproc
+            self._adiscard_engine()
+
+        stderr = _StderrTail()
         try:
-            process = subprocess.Popen(
-                [
-                    "docker",
-                    "exec",
-                    "-i",
-                    self.container_name,
-                    self.engine_cmd,
-                ],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
+            process = await asyncio.create_subprocess_exec(
+                "docker",
+                "exec",
+                "-i",
+                self.container_name,
+                self.engine_cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=stderr.write_fd,
             )
         except FileNotFoundError as exc:
             raise RuntimeError("Docker is not installed or not found in PATH") from exc
+        finally:
+            stderr.start()
 
-        if process.stdin is None or process.stdout is None:
-            raise RuntimeError("Failed to open Stockfish stdin/stdout streams")
-
+        self._aproc = process
+        self._astderr = stderr
+        self._asession = _SessionState()
         try:
-            for command in commands:
-                process.stdin.write(f"{command}\n")
-            process.stdin.flush()
+            assert process.stdin is not None
+            for command, reply in _HANDSHAKE:
+                process.stdin.write(f"{command}\n".encode())
+                await self._aread_until(process, reply)
+        except BaseException:
+            self._adiscard_engine()
+            raise
 
-            bestmove: Optional[str] = None
-            ponder: Optional[str] = None
-            evaluation: Optional[Evaluation] = None
-            best_depth = -1
+        return process
 
-            for raw_line in process.stdout:
-                line = raw_line.strip()
-                if not line:
-                    continue
+    def _adiscard_engine(self) -> None:
+        # Signal the pid directly: the transport may belong to a closed loop.
+        process = self._aproc
+        self._aproc = None
+        if process is not None and process.returncode is None:
+            try:
+                os.kill(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
 
-                if line.startswith("info"):
-                    parsed = self._parse_evaluation(line)
-                    if parsed and parsed.depth >= best_depth:
-                        evaluation = parsed
-                        best_depth = parsed.depth
-                    continue
+    def _native_async(self) -> bool:
+        """Whether the coroutines use their own asyncio ``docker exec`` session."""
 
-                if line.startswith("bestmove"):
-                    tokens = line.split()
-                    if len(tokens) >= 2:
-                        bestmove = tokens[1]
-                    if "ponder" in tokens:
-                        ponder_index = tokens.index("ponder")
-                        if ponder_index + 1 < len(tokens):
-                            ponder = tokens[ponder_index + 1]
-                    break
-
-            process.stdin.write("quit\n")
-            process.stdin.flush()
-            _, stderr_output = process.communicate(timeout=5)
-        finally:
-            if process.poll() is None:
-                process.kill()
+        return self.port is None and self.pool is None
+
+    async def _arun_searches(
+        self,
+        positions: Sequence[PositionSpec],
+        new_game: bool,
+        game_id: Optional[Hashable] = None,
+    ) -> list[Prediction]:
+        """Pipeline the searches; a writer task feeds commands while results are read."""
 
-        if process.returncode not in (0, None):
-            raise RuntimeError(f"Stockfish process failed: {stderr_output.strip()}")
+        if not self._native_async():
+            return await super()._arun_searches(positions, new_game, game_id)
 
-        if bestmove is None:
-            raise RuntimeError("Stockfish did not report a best move")
+        loop = asyncio.get_running_loop()
+        if self._aloop is not loop:
+            # The session and its lock are tied to the loop that created them.
+            self._adiscard_engine()
+            self._aloop = loop
+            self._alock = asyncio.Lock()
+        assert self._alock is not None
 
-        if evaluation is None:
-            evaluation = Evaluation(score_type="cp", score_value=0.0, depth=depth)
+        async with self._alock:
+            process = await self._aensure_engine()
+            windows = self._asession.windows(positions, new_game, game_id)
+            writer = asyncio.ensure_future(self._awrite_commands(process, windows))
+            try:
+                predictions = [await self._aread_prediction(process, depth) for _, _, depth in positions]
+                await writer
+            except BaseException:
+                writer.cancel()
+                self._adiscard_engine()
+                raise
 
-        return Prediction(bestmove=bestmove, ponder=ponder, evaluation=evaluation)
+        return predictions
 
-    @staticmethod
-    def _parse_evaluation(raw_line: str) -> Optional[Evaluation]:
-        tokens = raw_line.split()
-        if "score" not in tokens:
-            return None
+    async def _awrite_commands(
+        self,
+        process: asyncio.subprocess.Process,
+        windows: Iterable[tuple[list[str], list[int]]],
+    ) -> None:
+        assert process.stdin is not None
+        for commands, _ in windows:
+            process.stdin.write("".join(f"{command}\n" for command in commands).encode())
+            await process.stdin.drain()
 
+    async def _aread_line(self, process: asyncio.subprocess.Process) -> bytes:
+        assert process.stdout is not None
         try:
-            score_index = tokens.index("score")
-            score_type = tokens[score_index + 1]
-            score_value = tokens[score_index + 2]
-        except (ValueError, IndexError):
-            return None
+            line = await process.stdout.readuntil(b"\n")
+        except asyncio.IncompleteReadError:
+            await self._araise_engine_exit(process, self._astderr)
+        return line[:-1]
 
-        depth = 0
-        if "depth" in tokens:
-            try:
-                depth_index = tokens.index("depth")
-                depth_value = tokens[depth_index + 1]
-                depth = int(depth_value)
-            except (ValueError, IndexError):
-                depth = 0
+    async def _aread_until(self, process: asyncio.subprocess.Process, token: bytes) -> bytes:
+        while True:
+            line = await self._aread_line(process)
+            if line.startswith(token):
+                return line
+
+    async def _aread_prediction(self, process: asyncio.subprocess.Process, depth: int) -> Prediction:
+        search = _SearchOutput(depth)
+        while True:
+            prediction = search.feed(await self._aread_line(process))
+            if prediction is not None:
+                return prediction
 
+    @staticmethod
+    async def _araise_engine_exit(process: asyncio.subprocess.Process, stderr: Optional[_StderrTail]) -> NoReturn:
         try:
-            if score_type == "cp":
-                return Evaluation(score_type=score_type, score_value=int(score_value) / 100.0, depth=depth)
-            if score_type == "mate":
-                return Evaluation(score_type=score_type, score_value=int(score_value), depth=depth)
-            return Evaluation(score_type=score_type, score_value=float(score_value), depth=depth)
+            await asyncio.wait_for(process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            process.kill()
+        message = await asyncio.to_thread(stderr.text) if stderr is not None else ""
+        raise RuntimeError(f"Stockfish process failed: {message}")
+
+
+def _position_command(fen: str, moves: Optional[Sequence[str]]) -> str:
+    if moves:
+        if fen == "startpos":
+            return f"position startpos moves {' '.join(moves)}"
+        return f"position fen {fen} moves {' '.join(moves)}"
+    if fen == "startpos":
+        return "position startpos"
+    return f"position fen {fen}"
+
+
+def _command_windows(
+    positions: Sequence[PositionSpec],
+    new_game: bool,
+    position_command: Callable[[str, Optional[Sequence[str]]], str],
+) -> Iterator[tuple[list[str], list[int]]]:
+    """Group searches into writes of at most ``PIPELINE_WINDOW`` bytes.
+
+    Stockfish stops reading stdin while it is blocked on a full stdout pipe,
+    so the client must not write more than the pipe can hold before it
+    starts reading results back.
+    """
+
+    commands: list[str] = ["ucinewgame"] if new_game else []
+    depths: list[int] = []
+    size = 0
+    for fen, moves, depth in positions:
+        position = position_command(fen, moves)
+        commands.append(position)
+        commands.append(f"go depth {depth}")
+        depths.append(depth)
+        size += len(position) + 16
+        if size >= PIPELINE_WINDOW:
+            yield commands, depths
+            commands, depths, size = [], [], 0
+
+    if depths:
+        yield commands, depths
+
+
+def _drain_and_wait(process: subprocess.Popen[bytes], stderr: _StderrTail, killed: bool) -> Optional[str]:
+    """Reap a closed engine; return its stderr if it failed on its own."""
+
+    try:
+        process.communicate(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        return None
+
+    if killed or process.returncode == 0:
+        return None
+    return stderr.text() or f"exit status {process.returncode}"
+
+
+def _warn_engine_exit(message: str) -> None:
+    """Report an engine's abnormal exit against the first caller outside this module."""
+
+    frame = sys._getframe(1)
+    stacklevel = 2
+    while frame is not None and frame.f_code.co_filename in _INTERNAL_FILES:
+        frame = frame.f_back
+        stacklevel += 1
+    warnings.warn(f"Previous Stockfish engine exited abnormally: {message}", RuntimeWarning, stacklevel=stacklevel)
+
+
+def _encode_frame(payload: bytes) -> bytes:
+    # Same wire format as ``uci_proxy.encode_frame``; change both together.
+    return b"$%d\r\n%s\r\n" % (len(payload), payload)
+
+
+class _SearchOutput:
+    """Accumulate one ``go depth`` search's output until its ``bestmove`` line."""
+
+    __slots__ = ("depth", "_last_info", "_final")
+
+    def __init__(self, depth: int) -> None:
+        self.depth = depth
+        self._last_info: Optional[tuple[bytes, bytes, int]] = None
+        self._final = False
+
+    def feed(self, line: bytes) -> Optional[Prediction]:
+        """Consume one line; return the prediction once ``bestmove`` arrives."""
+
+        if line.startswith(b"info "):
+            # ``currmove``-only lines carry no score, and once an exact score
+            # at the requested depth is in, the remaining lines add nothing.
+            if self._final or b" score " not in line:
+                return None
+            parsed = _parse_evaluation(line)
+            if parsed is not None:
+                # Stockfish reports depths in non-decreasing order, so the
+                # last scored line is the one to keep.
+                self._last_info = parsed
+                if parsed[2] >= self.depth and b"bound" not in line:
+                    self._final = True
+        elif line.startswith(b"bestmove"):
+            return _to_prediction(line, self._last_info, self.depth)
+        return None
+
+
+def _collect_prediction(lines: Iterable[bytes], depth: int) -> Optional[Prediction]:
+    """Build the prediction from one search's output; ``None`` if ``bestmove`` never came."""
+
+    search = _SearchOutput(depth)
+    for line in lines:
+        prediction = search.feed(line)
+        if prediction is not None:
+            return prediction
+
+    return None
+
+
+def _to_prediction(
+    bestmove_line: bytes,
+    last_info: Optional[tuple[bytes, bytes, int]],
+    depth: int,
+) -> Prediction:
+    tokens = bestmove_line.split()
+    if len(tokens) < 2:
+        raise RuntimeError("Stockfish did not report a best move")
+
+    ponder: Optional[str] = None
+    if b"ponder" in tokens:
+        ponder_index = tokens.index(b"ponder")
+        if ponder_index + 1 < len(tokens):
+            ponder = tokens[ponder_index + 1].decode()
+
+    return Prediction(bestmove=tokens[1].decode(), ponder=ponder, evaluation=_to_evaluation(last_info, depth))
+
+
+def _to_evaluation(info: Optional[tuple[bytes, bytes, int]], depth: int) -> Evaluation:
+    """Build the ``Evaluation`` for the last scored ``info`` line of a search."""
+
+    if info is not None:
+        score_type, raw_value, info_depth = info
+        try:
+            if score_type == b"cp":
+                return Evaluation(score_type="cp", score_value=int(raw_value) / 100.0, depth=info_depth)
+            if score_type == b"mate":
+                return Evaluation(score_type="mate", score_value=int(raw_value), depth=info_depth)
+            return Evaluation(score_type=score_type.decode(), score_value=float(raw_value), depth=info_depth)
         except ValueError:
+            pass
+
+    return Evaluation(score_type="cp", score_value=0.0, depth=depth)
+
+
+def _parse_evaluation(raw_line: bytes) -> Optional[tuple[bytes, bytes, int]]:
+    """Scan an ``info`` line once for ``(score_type, raw_score_value, depth)``.
+
+    The score value is left as bytes; returns ``None`` when the line carries
+    no score.
+    """
+
+    if b" score " not in raw_line:
+        return None
+
+    tokens = iter(raw_line.split(b" "))
+    depth = 0
+    for token in tokens:
+        if token == b"depth":
+            try:
+                depth = int(next(tokens, b""))
+            except ValueError:
+                depth = 0
+        elif token == b"score":
+            score_type = next(tokens, b"")
+            raw_value = next(tokens, b"")
+            if not raw_value:
+                return None
+            return score_type, raw_value, depth
+        elif token == b"string":
             return None
 
+    return None
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Query the Stockfish docker service.")
@@ -217,14 +1570,24 @@ def main() -> None:
         default="stockfish-engine",
         help="Docker container running the Stockfish engine.",
     )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Host of the published Stockfish TCP port (used with --port).",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        help=f"Connect to the container's Stockfish TCP port (e.g. {DEFAULT_TCP_PORT}) instead of docker exec.",
+    )
 
     args = parser.parse_args()
-    client = StockfishDockerClient(container_name=args.container_name)
+    with StockfishDockerClient(container_name=args.container_name, host=args.host, port=args.port) as client:
+        if not client.is_service_ready():
+            raise RuntimeError("Stockfish container is not running; please start it with docker compose")
 
-    if not client.is_service_ready():
-        raise RuntimeError("Stockfish container is not running; please start it with docker compose")
+        prediction = client.predict_next_move(fen=args.fen, depth=args.depth, moves=args.moves)
 
-    prediction = client.predict_next_move(fen=args.fen, depth=args.depth, moves=args.moves)
     print(f"Best move: {prediction.bestmove}")
     if prediction.ponder:
         print(f"Ponder:     {prediction.ponder}")
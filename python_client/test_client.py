@@ -1,19 +1,134 @@
 """Verify the Stockfish Docker client can connect to the service."""
 
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
 import unittest
+import warnings
+from unittest import mock
 
-from python_client.client import StockfishDockerClient
+from python_client.client import (
+    DEFAULT_PROXY_PORT,
+    DEFAULT_TCP_PORT,
+    EnginePool,
+    Evaluation,
+    StockfishDockerClient,
+    StockfishTCPClient,
+    _FramedEngine,
+    _GameTracker,
+    _ProcessEngine,
+    _ReadyState,
+    _PositionCache,
+    _UCIClient,
+    _collect_prediction,
+    _parse_evaluation,
+)
+from python_client.uci_proxy import UCIProxyHandler, UCIProxyServer
+
+# Minimal UCI engine: scores each search by the number of moves played.
+FAKE_ENGINE = """
+import sys
+
+played = 0
+for line in sys.stdin:
+    command = line.split()
+    if not command:
+        continue
+    if command[0] == "uci":
+        print("id name Fake\\nuciok", flush=True)
+    elif command[0] == "isready":
+        print("readyok", flush=True)
+    elif command[0] == "position":
+        played = len(command[command.index("moves") + 1 :]) if "moves" in command else 0
+    elif command[0] == "go":
+        depth = int(command[2])
+        for current in range(1, depth + 1):
+            print(f"info depth {current} score cp {played} nodes 10 pv e2e4")
+        print("bestmove e2e4 ponder e7e5", flush=True)
+    elif command[0] == "quit":
+        break
+"""
 
 
 class StockfishDockerClientTest(unittest.TestCase):
     """Smoke test coverage against a live Stockfish container."""
 
-    def setUp(self) -> None:
-        self.client = StockfishDockerClient()
+    client: StockfishDockerClient
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # One client for the whole class, so the readiness check runs once.
+        cls.client = StockfishDockerClient()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.client.close()
 
     def test_service_readiness_is_boolean(self) -> None:
         self.assertIsInstance(self.client.is_service_ready(), bool)
 
+    def test_invalidated_readiness_is_checked_again(self) -> None:
+        ready = self.client._ready
+        self.addCleanup(setattr, ready, "cached", ready.cached)
+        ready.cached = (time.monotonic(), True)
+        self.client.invalidate_ready_cache()
+        self.assertIsNone(ready.cached)
+
+        with mock.patch.object(ready, "probe", return_value=False) as probe:
+            self.assertFalse(self.client.is_service_ready())
+        probe.assert_called_once_with()
+
+    def test_background_refresh_stops_with_its_last_client(self) -> None:
+        # Only the thread's lifecycle is under test; never fork docker inspect.
+        patcher = mock.patch.object(_ReadyState, "probe", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        name = f"stockfish-refresh-{os.getpid()}"
+        with self.assertRaises(ValueError):
+            StockfishDockerClient(container_name=name, docker_socket="/nonexistent", ready_refresh=0)
+
+        first = StockfishDockerClient(container_name=name, docker_socket="/nonexistent", ready_refresh=0.01)
+        second = StockfishDockerClient(container_name=name, docker_socket="/nonexistent", ready_refresh=60)
+        refresher = first._ready._refresher
+        assert refresher is not None
+        self.assertIs(second._ready._refresher, refresher)
+
+        first.close()
+        self.assertTrue(refresher.is_alive())
+        second.close()
+        refresher.join(timeout=5)
+        self.assertFalse(refresher.is_alive())
+
+    def test_engine_restart_keeps_the_ready_refresh_subscription(self) -> None:
+        patcher = mock.patch.object(_ReadyState, "probe", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        client = StockfishDockerClient(container_name=f"stockfish-restart-{os.getpid()}", ready_refresh=60)
+        self.addCleanup(client.close)
+
+        with mock.patch.object(client, "_open_engine", side_effect=EngineExitWarningTest._start_engine):
+            client.predict_next_move(depth=1)
+            engine = client._engine
+            assert isinstance(engine, _ProcessEngine)
+            EngineExitWarningTest._crash(engine)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                client.predict_next_move(depth=1)
+
+        self.assertIsNot(client._engine, engine)
+        self.assertEqual(client._ready_refresh, 60)
+        refresher = client._ready._refresher
+        self.assertTrue(refresher is not None and refresher.is_alive())
+
+    def test_not_running_answer_is_not_cached(self) -> None:
+        client = StockfishDockerClient(container_name=f"stockfish-missing-{os.getpid()}", docker_socket="/nonexistent")
+        self.assertFalse(client.is_service_ready())
+        self.assertIsNone(client._ready.cached)
+
     def test_prediction_returns_move_and_evaluation(self) -> None:
         if not self.client.is_service_ready():
             self.skipTest("Stockfish container is not running")
@@ -22,3 +137,339 @@ class StockfishDockerClientTest(unittest.TestCase):
         self.assertTrue(prediction.bestmove)
         self.assertIsInstance(prediction.evaluation.score_value, float)
         self.assertGreaterEqual(prediction.evaluation.depth, 0)
+
+    def test_engine_process_is_reused_between_queries(self) -> None:
+        if not self.client.is_service_ready():
+            self.skipTest("Stockfish container is not running")
+
+        self.client.predict_next_move(depth=3)
+        engine = self.client._engine
+        self.client.analyze_position(depth=3, moves=["e2e4"])
+        self.assertIsNotNone(engine)
+        self.assertIs(self.client._engine, engine)
+
+    def test_batch_prediction_returns_one_result_per_position(self) -> None:
+        if not self.client.is_service_ready():
+            self.skipTest("Stockfish container is not running")
+
+        positions = [("startpos", None, 3), ("startpos", ["e2e4"], 4), ("startpos", ["e2e4", "e7e5"], 3)]
+        predictions = self.client.predict_batch(positions)
+        self.assertEqual(len(predictions), len(positions))
+        for prediction in predictions:
+            self.assertTrue(prediction.bestmove)
+
+    def test_async_prediction_returns_move(self) -> None:
+        if not self.client.is_service_ready():
+            self.skipTest("Stockfish container is not running")
+
+        async def predict() -> list:
+            async with self.client:
+                return await asyncio.gather(
+                    self.client.apredict_next_move(depth=3),
+                    self.client.apredict_next_move(depth=3, moves=["e2e4"]),
+                )
+
+        predictions = asyncio.run(predict())
+        self.assertEqual(len(predictions), 2)
+        self.assertTrue(all(prediction.bestmove for prediction in predictions))
+
+    def test_pooled_client_reuses_healthy_engines(self) -> None:
+        if not self.client.is_service_ready():
+            self.skipTest("Stockfish container is not running")
+
+        with EnginePool.docker(max_size=2) as pool:
+            client = StockfishDockerClient(pool=pool)
+            first = client.predict_next_move(depth=3)
+            second = client.predict_next_move(depth=3, moves=["e2e4"])
+            with pool.acquire() as engine:
+                self.assertTrue(engine.ping(pool.health_timeout))
+
+        self.assertTrue(first.bestmove)
+        self.assertTrue(second.bestmove)
+
+
+class StockfishTCPClientTest(unittest.TestCase):
+    """Smoke test coverage against the container's published TCP port."""
+
+    def setUp(self) -> None:
+        self.client = StockfishTCPClient()
+
+    def tearDown(self) -> None:
+        self.client.close()
+
+    def skip_unless_reachable(self, port: int) -> None:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1.0).close()
+        except OSError:
+            self.skipTest(f"Stockfish port {port} is not reachable")
+
+    def test_prediction_returns_move_and_evaluation(self) -> None:
+        self.skip_unless_reachable(DEFAULT_TCP_PORT)
+
+        prediction = self.client.predict_next_move(depth=5)
+        self.assertTrue(prediction.bestmove)
+        self.assertGreaterEqual(prediction.evaluation.depth, 0)
+
+    def test_framed_proxy_prediction_matches_batch_size(self) -> None:
+        self.skip_unless_reachable(DEFAULT_PROXY_PORT)
+
+        client = StockfishTCPClient(port=DEFAULT_PROXY_PORT, framed=True)
+        self.addCleanup(client.close)
+        predictions = client.predict_batch([("startpos", None, 3), ("startpos", ["e2e4"], 3)])
+        self.assertEqual(len(predictions), 2)
+        self.assertTrue(all(prediction.bestmove for prediction in predictions))
+
+
+class FramedProtocolTest(unittest.TestCase):
+    """Offline coverage of the framed transport against an in-process proxy."""
+
+    port: int
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        engine = os.path.join(directory.name, "engine")
+        with open(engine, "w") as handle:
+            handle.write(f"#!{sys.executable}\n{FAKE_ENGINE}")
+        os.chmod(engine, 0o755)
+
+        handler = type("FakeEngineHandler", (UCIProxyHandler,), {"engine_cmd": engine})
+        server = UCIProxyServer(("127.0.0.1", 0), handler)
+        cls.addClassCleanup(server.server_close)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        cls.addClassCleanup(server.shutdown)
+        cls.port = server.server_address[1]
+
+    def test_batch_replies_arrive_in_order(self) -> None:
+        with StockfishTCPClient(port=self.port, framed=True) as client:
+            predictions = client.predict_batch(
+                [("startpos", None, 3), ("startpos", ["e2e4"], 2), ("startpos", ["e2e4", "e7e5"], 1)]
+            )
+
+        self.assertEqual([prediction.evaluation.depth for prediction in predictions], [3, 2, 1])
+        self.assertEqual([prediction.evaluation.score_value for prediction in predictions], [0.0, 0.01, 0.02])
+        self.assertEqual(predictions[0].ponder, "e7e5")
+
+    def test_proxy_rejects_out_of_range_frame_sizes(self) -> None:
+        with mock.patch("python_client.uci_proxy.subprocess.Popen") as popen:
+            for header in (b"$99999999999\r\n", b"$-1\r\n", b""):
+                with socket.create_connection(("127.0.0.1", self.port)) as sock:
+                    sock.sendall(header)
+                    sock.shutdown(socket.SHUT_WR)
+                    self.assertEqual(sock.recv(1), b"")
+
+        # Rejected connections never start an engine.
+        popen.assert_not_called()
+
+    def test_malformed_reply_header_raises_runtime_error(self) -> None:
+        for header in (b"$x1\r\n", b"$-4\r\n"):
+            with socket.create_server(("127.0.0.1", 0)) as listener:
+                engine = _FramedEngine("127.0.0.1", listener.getsockname()[1])
+                self.addCleanup(engine.kill)
+                peer, _ = listener.accept()
+                self.addCleanup(peer.close)
+
+                peer.sendall(header)
+                with self.assertRaises(RuntimeError):
+                    engine._read_frame()
+                engine._buffer.clear()
+                peer.sendall(header)
+                self.assertFalse(engine.ping(1.0))
+
+
+class PositionCacheTest(unittest.TestCase):
+    """Offline coverage of incremental ``position`` command building."""
+
+    def test_game_moving_forward_extends_the_cached_command(self) -> None:
+        cache = _PositionCache()
+        moves = ["e2e4"]
+        self.assertEqual(cache.command("startpos", moves), "position startpos moves e2e4")
+        moves += ["e7e5", "g1f3"]
+        self.assertEqual(cache.command("startpos", moves), "position startpos moves e2e4 e7e5 g1f3")
+
+    def test_repeated_position_reuses_the_cached_command(self) -> None:
+        cache = _PositionCache()
+        first = cache.command("startpos", ["e2e4", "e7e5"])
+        self.assertIs(cache.command("startpos", ("e2e4", "e7e5")), first)
+        self.assertEqual(cache.command("startpos", None), "position startpos")
+        self.assertEqual(cache.command("startpos", []), "position startpos")
+
+    def test_other_game_rebuilds_the_command(self) -> None:
+        cache = _PositionCache()
+        cache.command("startpos", ["e2e4", "e7e5"])
+        self.assertEqual(cache.command("startpos", ["d2d4"]), "position startpos moves d2d4")
+        self.assertEqual(cache.command("startpos", ["e2e4"]), "position startpos moves e2e4")
+        fen = "8/8/8/8/8/8/8/K6k w - - 0 1"
+        self.assertEqual(cache.command(fen, ["e2e4", "a1a2"]), f"position fen {fen} moves e2e4 a1a2")
+
+
+class GameTrackerTest(unittest.TestCase):
+    """Offline coverage of when tagged games reset the engine's hash."""
+
+    def test_first_game_on_fresh_engine_needs_no_reset(self) -> None:
+        tracker = _GameTracker()
+        self.assertFalse(tracker.enter(1, "startpos"))
+        self.assertFalse(tracker.enter(1, "startpos"))
+
+    def test_switching_game_or_start_position_resets(self) -> None:
+        tracker = _GameTracker()
+        tracker.enter(1, "startpos")
+        self.assertTrue(tracker.enter(2, "startpos"))
+        self.assertTrue(tracker.enter(2, "8/8/8/8/8/8/8/K6k w - - 0 1"))
+
+    def test_tagged_game_after_untagged_searches_resets(self) -> None:
+        tracker = _GameTracker()
+        self.assertFalse(tracker.enter(None, "startpos"))
+        self.assertFalse(tracker.enter(None, "startpos"))
+        self.assertTrue(tracker.enter(1, "startpos"))
+        self.assertFalse(tracker.enter(1, "startpos"))
+
+
+class SearchOutputTest(unittest.TestCase):
+    """Offline coverage of reading one search's output."""
+
+    def test_lines_after_the_final_depth_are_ignored(self) -> None:
+        lines = [
+            b"info depth 1 seldepth 1 score cp 10 nodes 20 pv e2e4",
+            b"info depth 2 currmove e2e4 currmovenumber 1",
+            b"info depth 2 seldepth 2 score cp 20 nodes 40 pv e2e4",
+            b"info depth 3 seldepth 3 score cp 30 nodes 80 pv e2e4",
+            b"info depth 4 seldepth 4 score cp 99 nodes 160 pv d2d4",
+            b"bestmove e2e4 ponder e7e5",
+        ]
+        prediction = _collect_prediction(lines, 3)
+        assert prediction is not None
+        self.assertEqual(prediction.bestmove, "e2e4")
+        self.assertEqual(prediction.ponder, "e7e5")
+        self.assertEqual(prediction.evaluation, Evaluation(score_type="cp", score_value=0.3, depth=3))
+
+    def test_bound_scores_do_not_end_the_search(self) -> None:
+        lines = [
+            b"info depth 3 seldepth 3 score cp 50 lowerbound nodes 80 pv e2e4",
+            b"info depth 3 seldepth 4 score cp 40 nodes 90 pv e2e4",
+            b"bestmove e2e4",
+        ]
+        prediction = _collect_prediction(lines, 3)
+        assert prediction is not None
+        self.assertEqual(prediction.evaluation, Evaluation(score_type="cp", score_value=0.4, depth=3))
+
+    def test_last_bound_score_is_kept_without_an_exact_one(self) -> None:
+        lines = [b"info depth 2 score mate 3 upperbound pv e2e4", b"bestmove e2e4"]
+        prediction = _collect_prediction(lines, 5)
+        assert prediction is not None
+        self.assertEqual(prediction.evaluation, Evaluation(score_type="mate", score_value=3, depth=2))
+
+    def test_search_without_scores_or_bestmove(self) -> None:
+        prediction = _collect_prediction([b"bestmove a2a3"], 4)
+        assert prediction is not None
+        self.assertEqual(prediction.evaluation, Evaluation(score_type="cp", score_value=0.0, depth=4))
+        self.assertIsNone(_collect_prediction([b"info depth 1 score cp 5"], 1))
+
+    def test_parse_evaluation_handles_strings_and_truncated_lines(self) -> None:
+        self.assertEqual(_parse_evaluation(b"info depth 12 seldepth 20 score mate -3 pv e2e4"), (b"mate", b"-3", 12))
+        self.assertEqual(_parse_evaluation(b"info depth x score cp 5"), (b"cp", b"5", 0))
+        self.assertIsNone(_parse_evaluation(b"info string the score is not a score"))
+        self.assertIsNone(_parse_evaluation(b"info depth 7 score cp"))
+        self.assertIsNone(_parse_evaluation(b"info depth 7 score"))
+        self.assertIsNone(_parse_evaluation(b"info depth 7 nodes 100"))
+
+
+class EngineExitWarningTest(unittest.TestCase):
+    """Offline coverage of reporting engines that died on their own."""
+
+    @staticmethod
+    def _start_engine() -> _ProcessEngine:
+        return _ProcessEngine([sys.executable, "-c", FAKE_ENGINE])
+
+    @staticmethod
+    def _crash(engine: _ProcessEngine) -> None:
+        engine._process.kill()
+        engine._process.wait()
+
+    def test_client_warns_at_the_callers_line(self) -> None:
+        class ProcessClient(_UCIClient):
+            def _open_engine(self) -> _ProcessEngine:
+                return EngineExitWarningTest._start_engine()
+
+        with ProcessClient() as client:
+            client.predict_batch([("startpos", None, 1)])
+            engine = client._engine
+            assert isinstance(engine, _ProcessEngine)
+            self._crash(engine)
+            client.close()
+            engine._reaped.result(timeout=10)
+
+            with self.assertWarnsRegex(RuntimeWarning, "exit status") as caught:
+                client.predict_batch([("startpos", None, 1)])
+
+        self.assertEqual(caught.filename, __file__)
+
+    def test_crash_before_a_clean_close_is_still_reported(self) -> None:
+        class ProcessClient(_UCIClient):
+            def _open_engine(self) -> _ProcessEngine:
+                return EngineExitWarningTest._start_engine()
+
+        client = ProcessClient()
+        client.predict_next_move(depth=1)
+        crashed = client._engine
+        assert isinstance(crashed, _ProcessEngine)
+        self._crash(crashed)
+        client.predict_next_move(depth=1)
+        replacement = client._engine
+        assert isinstance(replacement, _ProcessEngine)
+        client.close()
+        crashed._reaped.result(timeout=10)
+        replacement._reaped.result(timeout=10)
+
+        with self.assertWarnsRegex(RuntimeWarning, "exit status"):
+            client.predict_next_move(depth=1)
+        # Reaped engines are dropped once checked.
+        self.assertEqual(client._retired._engines, [])
+        client.close()
+
+    def test_pool_reports_engines_that_died_while_idle(self) -> None:
+        with EnginePool(self._start_engine, max_size=1) as pool:
+            with pool.acquire() as first:
+                pass
+            assert isinstance(first, _ProcessEngine)
+            self._crash(first)
+            with pool.acquire():
+                pass
+            first._reaped.result(timeout=10)
+
+            with self.assertWarnsRegex(RuntimeWarning, "exit status") as caught:
+                with pool.acquire():
+                    pass
+
+        self.assertEqual(caught.filename, __file__)
+
+
+class EnginePoolTest(unittest.TestCase):
+    """Offline coverage of pool shutdown."""
+
+    def test_close_wakes_callers_waiting_for_an_engine(self) -> None:
+        errors: list[BaseException] = []
+
+        def wait_for_engine() -> None:
+            try:
+                with pool.acquire():
+                    pass
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        pool = EnginePool(EngineExitWarningTest._start_engine, max_size=1)
+        with pool.acquire():
+            waiters = [threading.Thread(target=wait_for_engine) for _ in range(2)]
+            for waiter in waiters:
+                waiter.start()
+            time.sleep(0.1)
+            pool.close()
+
+        for waiter in waiters:
+            waiter.join(timeout=5)
+            self.assertFalse(waiter.is_alive())
+        self.assertEqual([str(error) for error in errors], ["Engine pool is closed"] * 2)
+        with self.assertRaisesRegex(RuntimeError, "closed"):
+            with pool.acquire():
+                pass
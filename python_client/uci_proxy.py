@@ -0,0 +1,126 @@
+"""Serve Stockfish over TCP using length-prefixed frames instead of raw UCI lines.
+
+Every connection gets its own engine. A request frame ``$<len>\\r\\n<commands>\\r\\n``
+carries newline-separated UCI commands; the reply frame holds every line the
+engine printed until each ``uci``/``isready``/``go`` command was answered by its
+``uciok``/``readyok``/``bestmove`` line. Clients therefore read one reply per
+request with a single exact-length read instead of scanning for sentinels.
+"""
+
+from __future__ import annotations
+
+import argparse
+import socketserver
+import subprocess
+
+# Reply line that completes each UCI command which produces output.
+TERMINATORS = {b"uci": b"uciok", b"isready": b"readyok", b"go": b"bestmove"}
+
+# Longest accepted ``$<len>\r\n`` header line; keep in sync with
+# ``client.MAX_FRAME_HEADER``.
+MAX_HEADER = 24
+
+# Largest accepted request payload. One search's commands are far smaller.
+MAX_REQUEST = 1024 * 1024
+
+# Keep in sync with ``client.DEFAULT_PROXY_PORT`` and docker-compose.yml.
+DEFAULT_PORT = 3334
+
+
+def encode_frame(payload: bytes) -> bytes:
+    # Same wire format as ``client._encode_frame``; change both together.
+    return b"$%d\r\n%s\r\n" % (len(payload), payload)
+
+
+class UCIProxyHandler(socketserver.StreamRequestHandler):
+    """Relay framed requests from one client to a private Stockfish process."""
+
+    engine_cmd = "stockfish"
+
+    def handle(self) -> None:
+        # Only start an engine once the client has sent a valid request.
+        payload = self._read_request()
+        if payload is None:
+            return
+
+        with subprocess.Popen(
+            [self.engine_cmd],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        ) as engine:
+            assert engine.stdin is not None and engine.stdout is not None
+            try:
+                while payload is not None:
+                    pending = [
+                        TERMINATORS[command.split(b" ", 1)[0]]
+                        for command in payload.split(b"\n")
+                        if command.split(b" ", 1)[0] in TERMINATORS
+                    ]
+                    engine.stdin.write(payload + b"\n")
+                    engine.stdin.flush()
+
+                    output = bytearray()
+                    for terminator in pending:
+                        while True:
+                            line = engine.stdout.readline()
+                            if not line:
+                                return
+                            output += line
+                            if line.startswith(terminator):
+                                break
+
+                    self.wfile.write(encode_frame(bytes(output[:-1])))
+                    self.wfile.flush()
+                    payload = self._read_request()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                if engine.poll() is None:
+                    try:
+                        engine.stdin.write(b"quit\n")
+                        engine.stdin.close()
+                    except BrokenPipeError:
+                        pass
+                    try:
+                        engine.wait(timeout=5)
+                    except subprocess.TimeoutExpired:
+                        engine.kill()
+
+    def _read_request(self) -> bytes | None:
+        """Return the next request payload, or ``None`` when the client is gone."""
+
+        header = self.rfile.readline(MAX_HEADER)
+        if not header.startswith(b"$") or not header.endswith(b"\r\n"):
+            return None
+        try:
+            size = int(header[1:-2])
+        except ValueError:
+            return None
+        if not 0 <= size <= MAX_REQUEST:
+            return None
+
+        frame = self.rfile.read(size + 2)
+        if len(frame) != size + 2:
+            return None
+        return frame[:size]
+
+
+class UCIProxyServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve Stockfish over a framed TCP protocol.")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on.")
+    parser.add_argument("--engine-cmd", default="stockfish", help="Stockfish executable to launch per connection.")
+
+    args = parser.parse_args()
+    UCIProxyHandler.engine_cmd = args.engine_cmd
+    with UCIProxyServer((args.host, args.port), UCIProxyHandler) as server:
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()